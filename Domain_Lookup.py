@@ -1,100 +1,407 @@
+import httpx
 import requests
 import json
+import logging
+import os
+import threading
+import types
+from importlib.util import find_spec
+from typing import Any, Mapping, Optional
 from datetime import datetime
+from cachetools import LRUCache, TTLCache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-def resolve_domain_with_hedera(domain_name):
+try:
+    import orjson
+except ImportError:  # optional speedup, fall back to the stdlib codec
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Shared read-only default for missing sub-objects, so lookups on absent
+# records/meta/balance don't allocate a fresh dict per call
+EMPTY_MAPPING = types.MappingProxyType({})
+
+class EmojiFormatter(logging.Formatter):
     """
-    Enhanced domain resolution with Hedera Mirror Node integration
+    Prefix CLI log lines with a per-level emoji, keeping the messages themselves plain
     """
-    print(f"🔍 Resolving domain: {domain_name}")
+    PREFIXES = {
+        logging.DEBUG: '🔍',
+        logging.INFO: '🌐',
+        logging.WARNING: '⚠️',
+        logging.ERROR: '❌'
+    }
     
-    # Step 1: Resolve domain via Unstoppable Domains API
-    ud_url = f"https://api.unstoppabledomains.com/resolve/domains/{domain_name}"
-    ud_headers = {
-        "Content-Type": "application/json",
-        "Authorization": "Bearer <YOUR_TOKEN_HERE>"
+    def format(self, record):
+        return f"{self.PREFIXES.get(record.levelno, '')} {super().format(record)}"
+
+def configure_cli_logging(level=logging.INFO):
+    """
+    Route log output to the terminal for the interactive scripts
+    """
+    handler = logging.StreamHandler()
+    handler.setFormatter(EmojiFormatter('%(message)s'))
+    logging.basicConfig(level=level, handlers=[handler])
+    # httpx logs every request at INFO, which would drown out the fan-out progress
+    logging.getLogger("httpx").setLevel(max(level, logging.WARNING))
+
+# Upper bound on concurrent connections per host, shared by the blocking
+# session pools and the async fan-out client so both paths stay within it
+MAX_CONNECTIONS = 50
+
+def _pooled_session(base_url, headers=None):
+    """
+    Build a keep-alive session whose connection pool is reused across calls to one host
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=MAX_CONNECTIONS,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=(500, 502, 503, 504),
+            # UD's reverse query is a read-only POST, so it is as safe to retry as a GET
+            allowed_methods=frozenset(["GET", "POST"]),
+            respect_retry_after_header=True
+        )
+    )
+    session.mount(base_url, adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
+
+# Built once and read-only, so the session-pooled and async paths can share it
+UD_HEADERS = types.MappingProxyType({
+    "Content-Type": "application/json",
+    "Authorization": f"Bearer {os.environ.get('UNSTOPPABLE_DOMAINS_API_KEY', '<YOUR_TOKEN_HERE>')}"
+})
+
+# Shared sessions, one per host, so repeated lookups skip the TCP + TLS handshake
+UD_SESSION = _pooled_session("https://api.unstoppabledomains.com", UD_HEADERS)
+MIRROR_SESSION = _pooled_session("https://testnet.mirrornode.hedera.com")
+
+# Domain->address mappings and account records change over minutes, not per
+# request, so repeat GETs inside the TTL are answered from memory. Entries hold the
+# raw body bytes and every hit decodes its own copy, so callers may mutate results
+UD_CACHE = TTLCache(maxsize=4096, ttl=300)
+MIRROR_CACHE = TTLCache(maxsize=4096, ttl=300)
+# 404s are remembered for a shorter time so newly created records show up quickly
+NEGATIVE_CACHE = TTLCache(maxsize=4096, ttl=60)
+# ETag / Last-Modified validators outlive the TTL entries, so an expired entry is
+# revalidated with a conditional GET and an unchanged body comes back as a bodyless 304
+VALIDATOR_CACHE = LRUCache(maxsize=4096)
+_CACHE_LOCK = threading.Lock()
+
+def _cache_key(url, params):
+    return (url, frozenset(params.items()) if params else frozenset())
+
+def _cache_lookup(cache, key):
+    """
+    Return (cached body bytes, cached 404 URL); both are None on a miss
+    """
+    with _CACHE_LOCK:
+        if key in cache:
+            return cache[key], None
+        return None, NEGATIVE_CACHE.get(key)
+
+def _cache_store(cache, key, value, response_headers=None):
+    etag = response_headers.get('ETag') if response_headers else None
+    last_modified = response_headers.get('Last-Modified') if response_headers else None
+    with _CACHE_LOCK:
+        cache[key] = value
+        if etag or last_modified:
+            VALIDATOR_CACHE[key] = (etag, last_modified, value)
+
+def _conditional_headers(key):
+    """
+    Return (request headers, last known body bytes) for revalidating an expired entry
+    """
+    with _CACHE_LOCK:
+        validators = VALIDATOR_CACHE.get(key)
+    if validators is None:
+        return None, None
+    
+    etag, last_modified, body = validators
+    headers = {}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+    return headers, body
+
+def _cache_miss(key, url):
+    # Only the URL is kept, so each client raises its own exception type on a hit
+    with _CACHE_LOCK:
+        NEGATIVE_CACHE[key] = url
+
+def _cached_404_message(url):
+    return f"404 Client Error: Not Found for url: {url} (cached)"
+
+def cached_get(session, cache, url, params=None):
+    """
+    GET a JSON document through the shared session, serving repeats from cache
+    """
+    key = _cache_key(url, params)
+    content, missing_url = _cache_lookup(cache, key)
+    if content is not None:
+        return load_json(content)
+    if missing_url is not None:
+        response = requests.Response()
+        response.status_code = 404
+        response.reason = "Not Found"
+        response.url = missing_url
+        raise requests.exceptions.HTTPError(_cached_404_message(missing_url), response=response)
+    
+    conditional, last_body = _conditional_headers(key)
+    response = session.get(url, params=params, headers=conditional)
+    if response.status_code == 304 and last_body is not None:
+        _cache_store(cache, key, last_body)
+        return load_json(last_body)
+    
+    try:
+        response.raise_for_status()
+    except requests.exceptions.HTTPError:
+        if response.status_code == 404:
+            _cache_miss(key, response.url)
+        raise
+    
+    data = response.json()  # decode first, so only valid JSON bodies are cached
+    _cache_store(cache, key, response.content, response.headers)
+    return data
+
+async def cached_get_async(client, cache, url, params=None, headers=None):
+    """
+    Async variant of cached_get for an httpx.AsyncClient
+    """
+    key = _cache_key(url, params)
+    content, missing_url = _cache_lookup(cache, key)
+    if content is not None:
+        return load_json(content)
+    if missing_url is not None:
+        request = httpx.Request("GET", missing_url)
+        raise httpx.HTTPStatusError(
+            _cached_404_message(missing_url), request=request,
+            response=httpx.Response(404, request=request)
+        )
+    
+    conditional, last_body = _conditional_headers(key)
+    if conditional:
+        headers = {**headers, **conditional} if headers else conditional
+    response = await client.get(url, params=params, headers=headers)
+    if response.status_code == 304 and last_body is not None:
+        _cache_store(cache, key, last_body)
+        return load_json(last_body)
+    
+    try:
+        response.raise_for_status()
+    except httpx.HTTPStatusError:
+        if response.status_code == 404:
+            _cache_miss(key, str(response.url))
+        raise
+    
+    data = response.json()  # decode first, so only valid JSON bodies are cached
+    _cache_store(cache, key, response.content, response.headers)
+    return data
+
+def dump_json(obj):
+    """
+    Pretty-print a result for the CLI, via orjson when it is installed
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
+def load_json(content):
+    """
+    Decode a raw response body, via orjson when it is installed
+    """
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+# HTTP/2 lets the fan-out multiplex every request over one connection per host;
+# it needs the optional h2 package (httpx[http2]), otherwise HTTP/1.1 pooling is used
+HTTP2_AVAILABLE = find_spec("h2") is not None
+
+def fanout_client():
+    """
+    Open an async client for concurrent fan-out, capped at MAX_CONNECTIONS.
+    Created per batch because an AsyncClient is bound to the event loop it runs on.
+    """
+    transport = httpx.AsyncHTTPTransport(
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=20),
+        retries=3
+    )
+    return httpx.AsyncClient(transport=transport)
+
+# Chain names and the UD record keys holding their addresses, index-aligned
+_ADDRESS_CHAINS = ('ethereum', 'polygon', 'bitcoin', 'hedera')
+_ADDRESS_RECORD_KEYS = (
+    'crypto.ETH.address', 'crypto.MATIC.address', 'crypto.BTC.address', 'crypto.HBAR.address'
+)
+
+def _extract_addresses(records: Mapping[str, Any]) -> dict[str, Optional[str]]:
+    """
+    Pick the chain addresses we care about out of a UD records dict
+    """
+    return dict(zip(_ADDRESS_CHAINS, map(records.get, _ADDRESS_RECORD_KEYS)))
+
+def _build_domain_result(
+    domain_name: str,
+    domain_data: dict[str, Any],
+    records: Mapping[str, Any],
+    addresses: dict[str, Optional[str]],
+    hedera_data: Optional[dict[str, Any]],
+    timestamp: Optional[str] = None
+) -> dict[str, Any]:
+    """
+    Compile the enhanced domain resolution response.
+    Batch callers pass one shared timestamp instead of stamping every item.
+    """
+    meta = domain_data.get('meta') or EMPTY_MAPPING
+    get = records.get
+    return {
+        'domain': domain_name,
+        'owner': meta.get('owner'),
+        'resolver': meta.get('resolver'),
+        'addresses': addresses,
+        'hedera_metadata': hedera_data,
+        'records': records or {},
+        'ipfs_hash': get('dweb.ipfs.hash'),
+        'website': get('dns.A'),
+        'email': get('whois.email.value'),
+        'social': {
+            'twitter': get('social.twitter.username'),
+            'discord': get('social.discord.username'),
+            'telegram': get('social.telegram.username')
+        },
+        'timestamp': timestamp or datetime.now().isoformat()
+    }
+
+def _build_account_metadata(account_id: str, account_data: dict[str, Any]) -> dict[str, Any]:
+    """
+    Compile the enhanced Hedera account metadata from a Mirror Node response
+    """
+    balance = account_data.get('balance') or EMPTY_MAPPING
+    tokens = balance.get('tokens', [])
+    return {
+        'account_id': account_id,
+        'balance': balance.get('balance', '0'),
+        'tokens': tokens,
+        'created_timestamp': account_data.get('created_timestamp'),
+        'is_deleted': account_data.get('deleted', False),
+        'staking_info': account_data.get('staking_info'),
+        'account_type': 'Standard Account' if account_data.get('account') else 'Unknown',
+        'token_relationships': len(tokens),
+        'network': 'testnet'
     }
+
+def fetch_domain_records(domain_name: str) -> tuple[dict[str, Any], Mapping[str, Any], dict[str, Optional[str]]]:
+    """
+    Resolve a domain via the Unstoppable Domains API into (domain data, records, addresses).
+    Request failures raise, as with query_hedera_mirror_node.
+    """
+    ud_url = f"https://api.unstoppabledomains.com/resolve/domains/{domain_name}"
+    domain_data = cached_get(UD_SESSION, UD_CACHE, ud_url)
+    
+    logger.debug("Domain resolved via Unstoppable Domains API")
+    
+    records = domain_data.get('records') or EMPTY_MAPPING
+    return domain_data, records, _extract_addresses(records)
+
+def resolve_domain_with_hedera(domain_name: str) -> Optional[dict[str, Any]]:
+    """
+    Enhanced domain resolution with Hedera Mirror Node integration
+    """
+    logger.info("Resolving domain: %s", domain_name)
     
     try:
-        ud_response = requests.get(ud_url, headers=ud_headers)
-        ud_response.raise_for_status()
-        domain_data = ud_response.json()
-        
-        print("✅ Domain resolved via Unstoppable Domains API")
-        
-        # Extract addresses
-        records = domain_data.get('records', {})
-        addresses = {
-            'ethereum': records.get('crypto.ETH.address'),
-            'polygon': records.get('crypto.MATIC.address'),
-            'bitcoin': records.get('crypto.BTC.address'),
-            'hedera': records.get('crypto.HBAR.address')
-        }
+        # Step 1: Resolve domain via Unstoppable Domains API
+        domain_data, records, addresses = fetch_domain_records(domain_name)
         
         # Step 2: If Hedera address exists, query Mirror Node
-        hedera_data = None
+        hedera_data: Optional[dict[str, Any]] = None
         if addresses['hedera']:
-            print(f"🌐 Found Hedera address: {addresses['hedera']}")
-            hedera_data = query_hedera_mirror_node(addresses['hedera'])
+            logger.info("Found Hedera address: %s", addresses['hedera'])
+            try:
+                hedera_data = query_hedera_mirror_node(addresses['hedera'])
+            except requests.exceptions.RequestException as e:
+                logger.warning("Could not fetch Hedera data: %s", e)
         
         # Step 3: Compile enhanced response
-        enhanced_result = {
-            'domain': domain_name,
-            'owner': domain_data.get('meta', {}).get('owner'),
-            'resolver': domain_data.get('meta', {}).get('resolver'),
-            'addresses': addresses,
-            'hedera_metadata': hedera_data,
-            'records': records,
-            'ipfs_hash': records.get('dweb.ipfs.hash'),
-            'website': records.get('dns.A'),
-            'email': records.get('whois.email.value'),
-            'social': {
-                'twitter': records.get('social.twitter.username'),
-                'discord': records.get('social.discord.username'),
-                'telegram': records.get('social.telegram.username')
-            },
-            'timestamp': datetime.now().isoformat()
-        }
-        
-        return enhanced_result
+        return _build_domain_result(domain_name, domain_data, records, addresses, hedera_data)
         
     except requests.exceptions.RequestException as e:
-        print(f"❌ Error resolving domain: {e}")
+        logger.error("Error resolving domain: %s", e)
         return None
 
-def query_hedera_mirror_node(account_id):
+def query_hedera_mirror_node(account_id: str) -> dict[str, Any]:
     """
-    Query Hedera Mirror Node for account information
+    Query Hedera Mirror Node for account information.
+    Transient failures are retried by the session adapter; anything left raises.
     """
     mirror_url = f"https://testnet.mirrornode.hedera.com/api/v1/accounts/{account_id}"
     
+    account_data = cached_get(MIRROR_SESSION, MIRROR_CACHE, mirror_url, {'transactions': 'false'})
+    
+    logger.debug("Retrieved Hedera account data for %s", account_id)
+    
+    return _build_account_metadata(account_id, account_data)
+
+async def resolve_domain_with_hedera_async(
+    client: httpx.AsyncClient, domain_name: str, timestamp: Optional[str] = None
+) -> Optional[dict[str, Any]]:
+    """
+    Async variant of resolve_domain_with_hedera for concurrent fan-out.
+    Reuses the caller's httpx.AsyncClient so every lookup shares its connections.
+    """
+    logger.debug("Resolving domain: %s", domain_name)
+    
+    ud_url = f"https://api.unstoppabledomains.com/resolve/domains/{domain_name}"
+    
     try:
-        response = requests.get(mirror_url)
-        response.raise_for_status()
-        account_data = response.json()
+        domain_data = await cached_get_async(client, UD_CACHE, ud_url, headers=UD_HEADERS)
         
-        print(f"✅ Retrieved Hedera account data for {account_id}")
+        logger.debug("Domain resolved via Unstoppable Domains API")
         
-        # Enhanced metadata
-        enhanced_data = {
-            'account_id': account_id,
-            'balance': account_data.get('balance', {}).get('balance', '0'),
-            'tokens': account_data.get('balance', {}).get('tokens', []),
-            'created_timestamp': account_data.get('created_timestamp'),
-            'is_deleted': account_data.get('deleted', False),
-            'staking_info': account_data.get('staking_info'),
-            'account_type': 'Standard Account' if account_data.get('account') else 'Unknown',
-            'token_relationships': len(account_data.get('balance', {}).get('tokens', [])),
-            'network': 'testnet'
-        }
+        records = domain_data.get('records') or EMPTY_MAPPING
+        addresses = _extract_addresses(records)
         
-        return enhanced_data
+        hedera_data: Optional[dict[str, Any]] = None
+        if addresses['hedera']:
+            logger.debug("Found Hedera address: %s", addresses['hedera'])
+            try:
+                hedera_data = await query_hedera_mirror_node_async(client, addresses['hedera'])
+            except (httpx.HTTPError, ValueError) as e:  # ValueError: non-JSON body
+                logger.warning("Could not fetch Hedera data: %s", e)
         
-    except requests.exceptions.RequestException as e:
-        print(f"⚠️ Could not fetch Hedera data: {e}")
+        return _build_domain_result(domain_name, domain_data, records, addresses, hedera_data, timestamp)
+        
+    except (httpx.HTTPError, ValueError) as e:
+        logger.error("Error resolving domain: %s", e)
         return None
 
+async def query_hedera_mirror_node_async(client: httpx.AsyncClient, account_id: str) -> dict[str, Any]:
+    """
+    Async variant of query_hedera_mirror_node; errors propagate to the caller
+    """
+    mirror_url = f"https://testnet.mirrornode.hedera.com/api/v1/accounts/{account_id}"
+    
+    account_data = await cached_get_async(
+        client, MIRROR_CACHE, mirror_url, {'transactions': 'false'}
+    )
+    
+    logger.debug("Retrieved Hedera account data for %s", account_id)
+    
+    return _build_account_metadata(account_id, account_data)
+
 def main():
+    configure_cli_logging()
+    
     # Example usage
     domain_name = input("Enter domain name (e.g., example.crypto): ").strip()
     
@@ -108,7 +415,7 @@ def main():
         print("\n" + "="*50)
         print("🎉 ENHANCED DOMAIN RESOLUTION RESULT")
         print("="*50)
-        print(json.dumps(result, indent=2))
+        print(dump_json(result))
         
         # Highlight Hedera integration
         if result['hedera_metadata']:
@@ -1,112 +1,140 @@
-import requests
-import json
+import asyncio
+import logging
+import httpx
 from datetime import datetime
+from Domain_Lookup import (
+    UD_HEADERS, MIRROR_CACHE, cached_get_async, configure_cli_logging, dump_json,
+    fanout_client, resolve_domain_with_hedera_async
+)
 
-def reverse_resolve_with_hedera(addresses):
+logger = logging.getLogger(__name__)
+
+async def _enhance_reverse_item(client, item, timestamp):
     """
-    Enhanced reverse domain resolution with Hedera Mirror Node integration
+    Attach the full Hedera-enhanced domain record to a single reverse result
     """
-    print(f"🔍 Reverse resolving addresses: {addresses}")
+    enhanced_item = item.copy()
     
-    url = "https://api.unstoppabledomains.com/resolve/reverse/query"
+    if item.get('domain'):
+        logger.debug("Enhancing domain: %s", item['domain'])
+        
+        # Get full domain data with Hedera integration
+        try:
+            enhanced_domain = await resolve_domain_with_hedera_async(client, item['domain'], timestamp)
+            enhanced_item['enhanced'] = enhanced_domain
+            
+            # Check if this domain has Hedera integration
+            if enhanced_domain and enhanced_domain.get('hedera_metadata'):
+                enhanced_item['has_hedera'] = True
+                enhanced_item['hedera_account'] = enhanced_domain['addresses']['hedera']
+            else:
+                enhanced_item['has_hedera'] = False
+                
+        except Exception as e:
+            logger.warning("Could not enhance domain %s: %s", item['domain'], e)
+            enhanced_item['enhanced'] = None
+            enhanced_item['has_hedera'] = False
+            enhanced_item['error'] = str(e)
     
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": "Bearer <YOUR_TOKEN_HERE>"
-    }
+    return enhanced_item
+
+async def reverse_resolve_with_hedera_async(addresses):
+    """
+    Enhanced reverse domain resolution with Hedera Mirror Node integration.
+    Every found domain is enhanced concurrently over a single httpx.AsyncClient.
+    """
+    logger.info("Reverse resolving addresses: %s", addresses)
+    
+    url = "https://api.unstoppabledomains.com/resolve/reverse/query"
     
     payload = {
         "addresses": addresses if isinstance(addresses, list) else [addresses]
     }
     
+    # One timestamp for the whole query; per-item stamps carry no extra meaning
+    timestamp = datetime.now().isoformat()
+    
     try:
-        # Step 1: Reverse resolve via UD API
-        response = requests.post(url, json=payload, headers=headers)
-        response.raise_for_status()
-        reverse_data = response.json()
-        
-        print("✅ Reverse resolution completed via Unstoppable Domains API")
-        
-        # Step 2: Enhance each found domain with Hedera data
-        enhanced_results = []
-        
-        for item in reverse_data.get('data', []):
-            enhanced_item = item.copy()
+        async with fanout_client() as client:
+            # Step 1: Reverse resolve via UD API
+            response = await client.post(url, json=payload, headers=UD_HEADERS)
+            response.raise_for_status()
+            reverse_data = response.json()
             
-            if item.get('domain'):
-                print(f"🌐 Enhancing domain: {item['domain']}")
-                
-                # Get full domain data with Hedera integration
-                try:
-                    from Domain_Lookup import resolve_domain_with_hedera
-                    enhanced_domain = resolve_domain_with_hedera(item['domain'])
-                    enhanced_item['enhanced'] = enhanced_domain
-                    
-                    # Check if this domain has Hedera integration
-                    if enhanced_domain and enhanced_domain.get('hedera_metadata'):
-                        enhanced_item['has_hedera'] = True
-                        enhanced_item['hedera_account'] = enhanced_domain['addresses']['hedera']
-                    else:
-                        enhanced_item['has_hedera'] = False
-                        
-                except Exception as e:
-                    print(f"⚠️ Could not enhance domain {item['domain']}: {e}")
-                    enhanced_item['enhanced'] = None
-                    enhanced_item['has_hedera'] = False
-                    enhanced_item['error'] = str(e)
+            logger.info("Reverse resolution completed via Unstoppable Domains API")
             
-            enhanced_results.append(enhanced_item)
+            # Step 2: Enhance each found domain with Hedera data
+            enhanced_results = await asyncio.gather(*[
+                _enhance_reverse_item(client, item, timestamp) for item in reverse_data.get('data', [])
+            ])
         
         # Step 3: Compile final response
+        hedera_count = sum(1 for r in enhanced_results if r.get('has_hedera'))
         final_result = {
             'results': enhanced_results,
             'total_found': len(enhanced_results),
-            'hedera_enabled_domains': len([r for r in enhanced_results if r.get('has_hedera')]),
+            'hedera_enabled_domains': hedera_count,
             'query_addresses': payload['addresses'],
-            'timestamp': datetime.now().isoformat()
+            'timestamp': timestamp
         }
         
         return final_result
         
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Error in reverse resolution: {e}")
+    except (httpx.HTTPError, ValueError) as e:  # ValueError: non-JSON body
+        logger.error("Error in reverse resolution: %s", e)
         return None
 
+def reverse_resolve_with_hedera(addresses):
+    """
+    Blocking wrapper around reverse_resolve_with_hedera_async
+    """
+    return asyncio.run(reverse_resolve_with_hedera_async(addresses))
+
+async def _fetch_account_async(client, account_id):
+    """
+    Fetch a single raw Mirror Node account record
+    """
+    try:
+        mirror_url = f"https://testnet.mirrornode.hedera.com/api/v1/accounts/{account_id}"
+        # The raw record is returned to callers, so keep its embedded transactions
+        account_data = await cached_get_async(client, MIRROR_CACHE, mirror_url)
+        
+        return {
+            'account_id': account_id,
+            'data': account_data,
+            'status': 'success'
+        }
+        
+    except Exception as e:
+        return {
+            'account_id': account_id,
+            'data': None,
+            'status': 'error',
+            'error': str(e)
+        }
+
+async def query_hedera_accounts_batch_async(account_ids):
+    """
+    Batch query multiple Hedera accounts via Mirror Node concurrently
+    """
+    logger.info("Batch querying %d Hedera accounts", len(account_ids))
+    
+    async with fanout_client() as client:
+        return await asyncio.gather(*[
+            _fetch_account_async(client, account_id) for account_id in account_ids
+        ])
+
 def query_hedera_accounts_batch(account_ids):
     """
     Batch query multiple Hedera accounts via Mirror Node
     """
-    print(f"🌐 Batch querying {len(account_ids)} Hedera accounts")
-    
-    results = []
-    for account_id in account_ids:
-        try:
-            mirror_url = f"https://testnet.mirrornode.hedera.com/api/v1/accounts/{account_id}"
-            response = requests.get(mirror_url)
-            response.raise_for_status()
-            account_data = response.json()
-            
-            results.append({
-                'account_id': account_id,
-                'data': account_data,
-                'status': 'success'
-            })
-            
-        except Exception as e:
-            results.append({
-                'account_id': account_id,
-                'data': None,
-                'status': 'error',
-                'error': str(e)
-            })
-    
-    return results
+    return asyncio.run(query_hedera_accounts_batch_async(account_ids))
 
 def find_domains_by_hedera_account(hedera_account_id):
     """
     Find domains that resolve to a specific Hedera account
     """
-    print(f"🔍 Searching for domains linked to Hedera account: {hedera_account_id}")
+    logger.info("Searching for domains linked to Hedera account: %s", hedera_account_id)
     
     # This would require a comprehensive search across known domains
     # For now, we'll demonstrate the concept with a placeholder
@@ -127,6 +155,8 @@ def find_domains_by_hedera_account(hedera_account_id):
     return placeholder_result
 
 def main():
+    configure_cli_logging()
+    
     print("🚀 Enhanced Reverse Domain Resolution with Hedera Integration")
     print("="*60)
     
@@ -137,8 +167,8 @@ def main():
         print("❌ At least one address is required")
         return
     
-    # Parse addresses
-    addresses = [addr.strip() for addr in addresses_input.split(',')]
+    # Parse addresses, dropping blanks and duplicates while keeping input order
+    addresses = list(dict.fromkeys(filter(None, (addr.strip() for addr in addresses_input.split(',')))))
     
     # Perform enhanced reverse resolution
     result = reverse_resolve_with_hedera(addresses)
@@ -147,7 +177,7 @@ def main():
         print("\n" + "="*60)
         print("🎉 ENHANCED REVERSE RESOLUTION RESULT")
         print("="*60)
-        print(json.dumps(result, indent=2))
+        print(dump_json(result))
         
         # Summary
         print(f"\n📊 SUMMARY:")
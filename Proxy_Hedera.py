@@ -1,62 +1,141 @@
+import asyncio
+import logging
+import time
+import httpx
 import requests
-import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from typing import Any, Optional
+from urllib.parse import parse_qsl, urljoin, urlsplit, urlunsplit
+from Domain_Lookup import (
+    EMPTY_MAPPING, MIRROR_SESSION, MIRROR_CACHE, cached_get, cached_get_async, configure_cli_logging,
+    dump_json, fanout_client, fetch_domain_records, load_json
+)
 
-def hedera_proxy_query(account_id=None, transaction_id=None, query_type="account"):
+logger = logging.getLogger(__name__)
+
+# Mirror Node only guarantees history queries over a bounded window,
+# so recent-activity lookups stay inside it
+RECENT_WINDOW_SECONDS = 60 * 24 * 60 * 60
+
+def _recent_window_start():
+    """
+    Mirror Node timestamp filter for the start of the recent-activity window
+    """
+    return f"gte:{int(time.time()) - RECENT_WINDOW_SECONDS}"
+
+# Mirror Node rejects page sizes above 100; MAX_LIST_ITEMS bounds what a
+# single proxy query will collect across pages
+MAX_PAGE_SIZE = 100
+MAX_LIST_ITEMS = 500
+
+def _paginate(url, params, page_limit):
+    """
+    Yield successive Mirror Node result pages, following links.next.
+    Each request asks for page_limit() items, replacing the limit carried by the next link.
+    """
+    params = list(params.items())
+    while url:
+        response = MIRROR_SESSION.get(url, params=[*params, ('limit', page_limit())])
+        response.raise_for_status()
+        page = load_json(response.content)
+        yield page
+
+        next_link = (page.get('links') or EMPTY_MAPPING).get('next')
+        if not next_link:
+            break
+        # The next link already carries the query string; split it out to swap the limit
+        parts = urlsplit(urljoin(url, next_link))
+        url = urlunsplit(parts._replace(query=''))
+        params = [(k, v) for k, v in parse_qsl(parts.query) if k != 'limit']
+
+def _collect(url, params, key, limit):
+    """
+    Gather up to limit items of one list field across pages, plus the last page's links.
+    The last request asks only for the remaining count, so its links.next resumes right
+    after the final returned item.
     """
-    Enhanced Hedera Mirror Node proxy with multiple query types
+    limit = min(limit, MAX_LIST_ITEMS)
+    items, links = [], {}
+    page_limit = lambda: min(limit - len(items), MAX_PAGE_SIZE)
+    for page in _paginate(url, params, page_limit):
+        items.extend(page.get(key) or [])
+        links = page.get('links') or {}
+        if len(items) >= limit:
+            break
+    return items[:limit], links
+
+def _build_account_data(
+    account_id: str,
+    account_data: dict[str, Any],
+    base_url: str,
+    timestamp: Optional[str] = None
+) -> dict[str, Any]:
+    """
+    Compile the enhanced account information from a Mirror Node response.
+    Batch callers pass one shared timestamp instead of stamping every item.
+    """
+    balance = account_data.get('balance') or EMPTY_MAPPING
+    return {
+        'query_type': 'account',
+        'account_id': account_id,
+        'balance': {
+            'hbar': balance.get('balance', '0'),
+            'tokens': balance.get('tokens', [])
+        },
+        'account_info': {
+            'created_timestamp': account_data.get('created_timestamp'),
+            'expiry_timestamp': account_data.get('expiry_timestamp'),
+            'auto_renew_period': account_data.get('auto_renew_period'),
+            'key': account_data.get('key'),
+            'deleted': account_data.get('deleted', False)
+        },
+        'staking_info': account_data.get('staking_info'),
+        'metadata': {
+            'network': 'testnet',
+            'query_timestamp': timestamp or datetime.now().isoformat(),
+            'mirror_node': base_url
+        }
+    }
+
+def hedera_proxy_query(
+    account_id: Optional[str] = None,
+    transaction_id: Optional[str] = None,
+    query_type: str = "account",
+    limit: Optional[int] = None
+) -> Optional[dict[str, Any]]:
+    """
+    Enhanced Hedera Mirror Node proxy with multiple query types.
+    limit caps how many items the transactions and tokens queries return;
+    pages are followed via links.next until it is reached.
     """
     base_url = "https://testnet.mirrornode.hedera.com/api/v1"
     
-    print(f"🌐 Hedera Mirror Node Proxy - Query Type: {query_type}")
+    logger.info("Hedera Mirror Node Proxy - Query Type: %s", query_type)
     
     try:
         if query_type == "account" and account_id:
             # Account information query
             url = f"{base_url}/accounts/{account_id}"
-            response = requests.get(url)
-            response.raise_for_status()
-            
-            account_data = response.json()
+            account_data = cached_get(MIRROR_SESSION, MIRROR_CACHE, url, {'transactions': 'false'})
             
             # Enhanced account information
-            enhanced_data = {
-                'query_type': 'account',
-                'account_id': account_id,
-                'balance': {
-                    'hbar': account_data.get('balance', {}).get('balance', '0'),
-                    'tokens': account_data.get('balance', {}).get('tokens', [])
-                },
-                'account_info': {
-                    'created_timestamp': account_data.get('created_timestamp'),
-                    'expiry_timestamp': account_data.get('expiry_timestamp'),
-                    'auto_renew_period': account_data.get('auto_renew_period'),
-                    'key': account_data.get('key'),
-                    'deleted': account_data.get('deleted', False)
-                },
-                'staking_info': account_data.get('staking_info'),
-                'metadata': {
-                    'network': 'testnet',
-                    'query_timestamp': datetime.now().isoformat(),
-                    'mirror_node': base_url
-                }
-            }
+            enhanced_data = _build_account_data(account_id, account_data, base_url)
             
             return enhanced_data
             
         elif query_type == "transactions" and account_id:
             # Account transactions query
             url = f"{base_url}/accounts/{account_id}/transactions"
-            response = requests.get(url, params={'limit': 10})
-            response.raise_for_status()
-            
-            transactions_data = response.json()
+            transactions, links = _collect(
+                url, {'timestamp': _recent_window_start()}, 'transactions', limit or 10
+            )
             
             enhanced_data = {
                 'query_type': 'transactions',
                 'account_id': account_id,
-                'transactions': transactions_data.get('transactions', []),
-                'links': transactions_data.get('links', {}),
+                'transactions': transactions,
+                'links': links,
                 'metadata': {
                     'network': 'testnet',
                     'query_timestamp': datetime.now().isoformat(),
@@ -69,7 +148,7 @@ def hedera_proxy_query(account_id=None, transaction_id=None, query_type="account
         elif query_type == "transaction" and transaction_id:
             # Specific transaction query
             url = f"{base_url}/transactions/{transaction_id}"
-            response = requests.get(url)
+            response = MIRROR_SESSION.get(url)
             response.raise_for_status()
             
             transaction_data = response.json()
@@ -90,15 +169,12 @@ def hedera_proxy_query(account_id=None, transaction_id=None, query_type="account
         elif query_type == "tokens":
             # Tokens query
             url = f"{base_url}/tokens"
-            response = requests.get(url, params={'limit': 25})
-            response.raise_for_status()
-            
-            tokens_data = response.json()
+            tokens, links = _collect(url, {}, 'tokens', limit or 25)
             
             enhanced_data = {
                 'query_type': 'tokens',
-                'tokens': tokens_data.get('tokens', []),
-                'links': tokens_data.get('links', {}),
+                'tokens': tokens,
+                'links': links,
                 'metadata': {
                     'network': 'testnet',
                     'query_timestamp': datetime.now().isoformat(),
@@ -112,40 +188,33 @@ def hedera_proxy_query(account_id=None, transaction_id=None, query_type="account
             raise ValueError(f"Invalid query type or missing parameters: {query_type}")
             
     except requests.exceptions.RequestException as e:
-        print(f"❌ Hedera Mirror Node API error: {e}")
+        logger.error("Hedera Mirror Node API error: %s", e)
         return None
     except Exception as e:
-        print(f"❌ Error: {e}")
+        logger.error("Error: %s", e)
         return None
 
 def hedera_domain_integration_check(domain_name):
     """
     Check if a domain has Hedera integration and fetch related data
     """
-    print(f"🔍 Checking Hedera integration for domain: {domain_name}")
+    logger.info("Checking Hedera integration for domain: %s", domain_name)
     
     try:
-        # First resolve the domain via UD API
-        ud_url = f"https://api.unstoppabledomains.com/resolve/domains/{domain_name}"
-        ud_headers = {
-            "Content-Type": "application/json",
-            "Authorization": "Bearer <YOUR_TOKEN_HERE>"
-        }
-        
-        ud_response = requests.get(ud_url, headers=ud_headers)
-        ud_response.raise_for_status()
-        domain_data = ud_response.json()
-        
-        # Check for Hedera address
-        records = domain_data.get('records', {})
-        hedera_address = records.get('crypto.HBAR.address')
-        
+        # Only the UD lookup; the account record is fetched below, alongside transactions
+        _, records, addresses = fetch_domain_records(domain_name)
+        records = records or {}
+        hedera_address = addresses['hedera']
+
         if hedera_address:
-            print(f"✅ Found Hedera address: {hedera_address}")
+            logger.info("Found Hedera address: %s", hedera_address)
             
-            # Get comprehensive Hedera data
-            account_info = hedera_proxy_query(hedera_address, query_type="account")
-            transactions = hedera_proxy_query(hedera_address, query_type="transactions")
+            # Get comprehensive Hedera data; the two lookups are independent
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                account_future = executor.submit(hedera_proxy_query, hedera_address, None, "account")
+                transactions_future = executor.submit(hedera_proxy_query, hedera_address, None, "transactions")
+                account_info = account_future.result()
+                transactions = transactions_future.result()
             
             integration_result = {
                 'domain': domain_name,
@@ -159,7 +228,7 @@ def hedera_domain_integration_check(domain_name):
             
             return integration_result
         else:
-            print("⚠️ No Hedera address found for this domain")
+            logger.warning("No Hedera address found for this domain")
             return {
                 'domain': domain_name,
                 'hedera_address': None,
@@ -169,42 +238,64 @@ def hedera_domain_integration_check(domain_name):
             }
             
     except Exception as e:
-        print(f"❌ Error checking Hedera integration: {e}")
+        logger.error("Error checking Hedera integration: %s", e)
         return None
 
-def batch_hedera_query(account_ids):
+async def _fetch_account(client, account_id, timestamp):
     """
-    Batch query multiple Hedera accounts
+    Fetch one account for the batch fan-out and wrap it in a batch result entry
     """
-    print(f"🌐 Batch querying {len(account_ids)} Hedera accounts")
+    base_url = "https://testnet.mirrornode.hedera.com/api/v1"
     
-    results = []
-    for account_id in account_ids:
-        print(f"   Querying: {account_id}")
-        account_data = hedera_proxy_query(account_id, query_type="account")
-        
-        if account_data:
-            results.append({
-                'account_id': account_id,
-                'status': 'success',
-                'data': account_data
-            })
-        else:
-            results.append({
-                'account_id': account_id,
-                'status': 'error',
-                'data': None
-            })
+    logger.debug("Querying: %s", account_id)
+    
+    try:
+        url = f"{base_url}/accounts/{account_id}"
+        account_data = await cached_get_async(client, MIRROR_CACHE, url, {'transactions': 'false'})
+
+        return {
+            'account_id': account_id,
+            'status': 'success',
+            'data': _build_account_data(account_id, account_data, base_url, timestamp)
+        }
+
+    except (httpx.HTTPError, ValueError) as e:  # ValueError: non-JSON body
+        logger.error("Hedera Mirror Node API error: %s", e)
+        return {
+            'account_id': account_id,
+            'status': 'error',
+            'data': None
+        }
+
+async def batch_hedera_query_async(account_ids):
+    """
+    Batch query multiple Hedera accounts concurrently over one httpx.AsyncClient
+    """
+    logger.info("Batch querying %d Hedera accounts", len(account_ids))
+    
+    timestamp = datetime.now().isoformat()
+    async with fanout_client() as client:
+        results = await asyncio.gather(*[
+            _fetch_account(client, account_id, timestamp) for account_id in account_ids
+        ])
     
     return {
         'batch_query': True,
         'total_accounts': len(account_ids),
-        'successful_queries': len([r for r in results if r['status'] == 'success']),
+        'successful_queries': sum(1 for r in results if r['status'] == 'success'),
         'results': results,
-        'timestamp': datetime.now().isoformat()
+        'timestamp': timestamp
     }
 
+def batch_hedera_query(account_ids):
+    """
+    Batch query multiple Hedera accounts
+    """
+    return asyncio.run(batch_hedera_query_async(account_ids))
+
 def main():
+    configure_cli_logging()
+    
     print("🚀 Hedera Mirror Node Proxy with Domain Integration")
     print("="*60)
     
@@ -216,41 +307,41 @@ def main():
         print("4. Batch query accounts")
         print("5. List recent tokens")
         print("6. Exit")
-        
+
         choice = input("\nEnter your choice (1-6): ").strip()
-        
+
         if choice == "1":
             account_id = input("Enter Hedera account ID (e.g., 0.0.123456): ").strip()
             if account_id:
                 result = hedera_proxy_query(account_id, query_type="account")
                 if result:
-                    print(json.dumps(result, indent=2))
+                    print(dump_json(result))
                     
         elif choice == "2":
             account_id = input("Enter Hedera account ID: ").strip()
             if account_id:
                 result = hedera_proxy_query(account_id, query_type="transactions")
                 if result:
-                    print(json.dumps(result, indent=2))
+                    print(dump_json(result))
                     
         elif choice == "3":
             domain = input("Enter domain name (e.g., example.crypto): ").strip()
             if domain:
                 result = hedera_domain_integration_check(domain)
                 if result:
-                    print(json.dumps(result, indent=2))
+                    print(dump_json(result))
                     
         elif choice == "4":
             accounts_input = input("Enter account IDs (comma-separated): ").strip()
             if accounts_input:
-                account_ids = [acc.strip() for acc in accounts_input.split(',')]
+                account_ids = list(dict.fromkeys(filter(None, (acc.strip() for acc in accounts_input.split(',')))))
                 result = batch_hedera_query(account_ids)
-                print(json.dumps(result, indent=2))
+                print(dump_json(result))
                 
         elif choice == "5":
             result = hedera_proxy_query(query_type="tokens")
             if result:
-                print(json.dumps(result, indent=2))
+                print(dump_json(result))
                 
         elif choice == "6":
             print("👋 Goodbye!")
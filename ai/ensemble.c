@@ -0,0 +1,59 @@
+/*
+ * MindKey NFC - single native entry point for the fraud ensemble
+ * Runs both tl2cgen-compiled tree members on each row and averages their
+ * fraud probabilities, so Python makes one call per batch.
+ */
+
+#include <math.h>
+#include <stddef.h>
+#include <string.h>
+
+/* Matches the Entry union tl2cgen generates for float64 thresholds */
+union Entry {
+  int missing;
+  double fvalue;
+  int qvalue;
+};
+
+/* The predict() symbol exported by each compiled member library */
+typedef void (*predict_fn)(union Entry* data, int pred_margin, double* result);
+
+#define MAX_FEATURES 64
+#define MAX_OUTPUTS 16
+
+/*
+ * out[r] = (rf's last class probability + gb's last class probability) / 2
+ * X is a C-contiguous float32 (n_rows, n_cols) matrix; NaN marks a missing value.
+ * Returns 0, or -1 when the shapes exceed the fixed row buffers.
+ */
+int ensemble_predict(predict_fn rf, int rf_outputs, predict_fn gb, int gb_outputs,
+                     const float* X, size_t n_rows, int n_cols, double* out) {
+  union Entry rf_row[MAX_FEATURES], gb_row[MAX_FEATURES];
+  double rf_result[MAX_OUTPUTS], gb_result[MAX_OUTPUTS];
+
+  if (n_cols > MAX_FEATURES || rf_outputs > MAX_OUTPUTS || gb_outputs > MAX_OUTPUTS) {
+    return -1;
+  }
+
+  for (size_t r = 0; r < n_rows; ++r) {
+    const float* x = X + r * (size_t)n_cols;
+    for (int i = 0; i < n_cols; ++i) {
+      if (isnan(x[i])) {
+        rf_row[i].missing = -1;
+      } else {
+        rf_row[i].fvalue = (double)x[i];
+      }
+    }
+    /* predict() quantizes its row in place, so each member reads its own copy */
+    memcpy(gb_row, rf_row, sizeof(union Entry) * (size_t)n_cols);
+
+    /* Members accumulate tree outputs into result, which must start at zero */
+    memset(rf_result, 0, sizeof(double) * (size_t)rf_outputs);
+    memset(gb_result, 0, sizeof(double) * (size_t)gb_outputs);
+    rf(rf_row, 0, rf_result);
+    gb(gb_row, 0, gb_result);
+
+    out[r] = (rf_result[rf_outputs - 1] + gb_result[gb_outputs - 1]) * 0.5;
+  }
+  return 0;
+}
@@ -12,98 +12,293 @@ from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, precision_score, recall_score
 import joblib
 import json
+import contextlib
+import ctypes
 import hashlib
+import os
+import queue
+import subprocess
+import sys
+import threading
 import time
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
 import logging
 
+# Treelite/tl2cgen (native tree compilation) and numba (JIT row building) are optional and
+# imported on demand: the Node bridge starts a process per request, and importing them up
+# front costs more than they save there. Already-compiled libraries load through ctypes alone.
+treelite = None
+tl2cgen = None
+
+try:
+    import orjson
+except ImportError:  # optional speedup, fall back to the stdlib codec
+    orjson = None
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+MODEL_PATH = 'models/fraud_detection_model.pkl'
+# Treelite checkpoints and scaler statistics, used instead of the pickle when Treelite is installed
+TREELITE_PATHS = {'rf': 'models/rf.treelite', 'gb': 'models/gb.treelite'}
+LIB_PATHS = {'rf': 'models/rf.so', 'gb': 'models/gb.so'}
+SCALER_PATH = 'models/scaler.npz'
+# C entry point that runs both compiled members in one call, built next to their libraries
+ENSEMBLE_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ensemble.c')
+ENSEMBLE_LIB_PATH = 'models/ensemble.so'
+RESULT_TIMEOUT = 5  # seconds to wait for a queued prediction
+# predict_fraud calls after which an engine counts as long-lived and JIT-compiles its row builder
+JIT_AFTER_CALLS = 10_000
+
+FEATURE_COLUMNS = [
+    'transaction_amount', 'hour_of_day', 'day_of_week',
+    'user_age_days', 'previous_transactions', 'avg_transaction_amount',
+    'location_risk_score', 'device_risk_score', 'velocity_score',
+    'behavioral_score', 'time_since_last_tx', 'amount_deviation'
+]
+# Column positions in FEATURE_COLUMNS order
+(IDX_AMOUNT, IDX_HOUR, IDX_DOW,
+ IDX_USER_AGE, IDX_PREV_TX, IDX_AVG_AMOUNT,
+ IDX_LOC, IDX_DEV, IDX_VEL,
+ IDX_BEH, IDX_SINCE_LAST, IDX_DEVIATION) = range(len(FEATURE_COLUMNS))
+# Mock risk score columns, in the order _build_result takes them
+SCORE_COLUMNS = [IDX_BEH, IDX_LOC, IDX_DEV, IDX_VEL]
+SCORE_BEH, SCORE_LOC, SCORE_DEV, SCORE_VEL = range(len(SCORE_COLUMNS))
+
+BETA_TABLE_SIZE = 1 << 10  # samples per mock risk distribution, power of two
+BETA_PARAMS = [(2, 8), (5, 5), (4, 6), (8, 2), (6, 4)]
+LOW_RISK_COUNTRIES = ['NG', 'KE', 'GH', 'ZA']
+
+# (timestamp ns, datetime, ISO string) of the last clock read, swapped as one tuple
+_clock = (0, None, '')
+
+def _now():
+    """Current datetime and its ISO string, re-read at most once per millisecond"""
+    global _clock
+    ns = time.time_ns()
+    if ns - _clock[0] >= 1_000_000:
+        now = datetime.now()
+        _clock = (ns, now, now.isoformat())
+    return _clock[1], _clock[2]
+
+def _import_treelite():
+    """Import Treelite and tl2cgen on first use; False when they are not installed"""
+    global treelite, tl2cgen
+    if tl2cgen is None:
+        try:
+            import treelite as treelite_module
+            import tl2cgen as tl2cgen_module
+        except ImportError:  # sklearn is used otherwise
+            return False
+        treelite, tl2cgen = treelite_module, tl2cgen_module
+    return True
+
+def _publish_atomically(path, write):
+    """
+    Run write(tmp_path), then move the file into place with os.replace.
+    Workers starting together then never read a partially written model file.
+    """
+    root, ext = os.path.splitext(path)
+    tmp_path = f'{root}.{os.getpid()}.tmp{ext}'  # keeps the extension, np.savez would add one
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+# Plain Python, JIT-compiled by numba once an engine is long-lived (see _jit_row_builder).
+# No fastmath: fused multiply-adds would drift from the NumPy batch path and flip
+# borderline tree splits, so the same transaction must round identically in both
+def _build_scaled_row(amount, hour, dow, age, prev_tx, avg_amount, loc_risk, dev_risk,
+                      vel_risk, beh_score, since_last_tx, out, inv_scale, neg_mean_over_scale):
+    """Write one standardized feature row, in FEATURE_COLUMNS order, into out"""
+    # Under numba the module-level IDX_* ints are frozen as compile-time constants
+    amount = np.float32(amount)
+    avg_amount = np.float32(avg_amount)
+    out[IDX_AMOUNT] = amount * inv_scale[IDX_AMOUNT] + neg_mean_over_scale[IDX_AMOUNT]
+    out[IDX_HOUR] = np.float32(hour) * inv_scale[IDX_HOUR] + neg_mean_over_scale[IDX_HOUR]
+    out[IDX_DOW] = np.float32(dow) * inv_scale[IDX_DOW] + neg_mean_over_scale[IDX_DOW]
+    out[IDX_USER_AGE] = np.float32(age) * inv_scale[IDX_USER_AGE] + neg_mean_over_scale[IDX_USER_AGE]
+    out[IDX_PREV_TX] = np.float32(prev_tx) * inv_scale[IDX_PREV_TX] + neg_mean_over_scale[IDX_PREV_TX]
+    out[IDX_AVG_AMOUNT] = avg_amount * inv_scale[IDX_AVG_AMOUNT] + neg_mean_over_scale[IDX_AVG_AMOUNT]
+    out[IDX_LOC] = np.float32(loc_risk) * inv_scale[IDX_LOC] + neg_mean_over_scale[IDX_LOC]
+    out[IDX_DEV] = np.float32(dev_risk) * inv_scale[IDX_DEV] + neg_mean_over_scale[IDX_DEV]
+    out[IDX_VEL] = np.float32(vel_risk) * inv_scale[IDX_VEL] + neg_mean_over_scale[IDX_VEL]
+    out[IDX_BEH] = np.float32(beh_score) * inv_scale[IDX_BEH] + neg_mean_over_scale[IDX_BEH]
+    out[IDX_SINCE_LAST] = np.float32(since_last_tx) * inv_scale[IDX_SINCE_LAST] + neg_mean_over_scale[IDX_SINCE_LAST]
+    out[IDX_DEVIATION] = abs(amount - avg_amount) * inv_scale[IDX_DEVIATION] + neg_mean_over_scale[IDX_DEVIATION]
+
+def _fit_rf(X, y):
+    """Fit the random forest member of the ensemble"""
+    return RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1).fit(X, y)
+
+def _fit_gb(X, y):
+    """Fit the gradient boosting member of the ensemble"""
+    return GradientBoostingClassifier(n_estimators=100, random_state=42).fit(X, y)
+
+@contextlib.contextmanager
+def _stdout_to_stderr():
+    """
+    Send stdout to stderr, at the file descriptor level too.
+    The Node bridge parses stdout as JSON, but the tl2cgen compiler log and gcc write to fd 1 directly.
+    """
+    sys.stdout.flush()
+    saved_fd = os.dup(1)
+    try:
+        os.dup2(2, 1)
+        with contextlib.redirect_stdout(sys.stderr):
+            yield
+    finally:
+        sys.stdout.flush()
+        os.dup2(saved_fd, 1)
+        os.close(saved_fd)
+
+class _NativeEnsemble:
+    """The compiled RF and GB members behind ensemble.c's single ensemble_predict call"""
+    
+    def __init__(self, member_paths, libpath=ENSEMBLE_LIB_PATH):
+        self._members = [ctypes.CDLL(os.path.abspath(path)) for path in member_paths]
+        self._predict_args = []
+        for member, path in zip(self._members, member_paths):
+            member.get_threshold_type.restype = ctypes.c_char_p
+            member.get_leaf_output_type.restype = ctypes.c_char_p
+            types = (member.get_threshold_type(), member.get_leaf_output_type())
+            if types != (b'float64', b'float64'):
+                raise RuntimeError(f"{path} has {types} thresholds/leaves, ensemble.c expects float64")
+            n_targets = member.get_num_target()
+            num_class = (ctypes.c_int32 * n_targets)()
+            member.get_num_class(num_class)
+            predict = ctypes.cast(member.predict, ctypes.c_void_p)
+            self._predict_args += [predict, n_targets * max(num_class)]
+        
+        # Recompile only when the source is newer than the cached library
+        if not os.path.exists(libpath) or os.path.getmtime(libpath) < os.path.getmtime(ENSEMBLE_SOURCE):
+            self._build(libpath)
+        self._lib = ctypes.CDLL(os.path.abspath(libpath))
+        self._lib.ensemble_predict.restype = ctypes.c_int
+        self._lib.ensemble_predict.argtypes = [
+            ctypes.c_void_p, ctypes.c_int, ctypes.c_void_p, ctypes.c_int,
+            ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int, ctypes.c_void_p
+        ]
+    
+    @staticmethod
+    def _build(libpath):
+        """Compile ensemble.c and publish it atomically, like the member libraries"""
+        _publish_atomically(libpath, lambda tmp_path: subprocess.run(
+            ['gcc', '-O3', '-shared', '-fPIC', '-o', tmp_path, ENSEMBLE_SOURCE, '-lm'],
+            check=True, stdout=subprocess.DEVNULL  # keep the bridge's stdout clean
+        ))
+    
+    def predict(self, X):
+        """Averaged fraud probability per row of a float32 (n, n_features) matrix"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        out = np.empty(X.shape[0])
+        # ctypes drops the GIL for the call; buffers live on the C stack, so it is reentrant
+        if self._lib.ensemble_predict(*self._predict_args, X.ctypes.data, X.shape[0], X.shape[1],
+                                      out.ctypes.data) != 0:
+            raise ValueError(f"ensemble_predict cannot take {X.shape[1]} features")
+        return out
+
 class FraudDetectionEngine:
+    # Indexed by the number of thresholds (0.3, 0.7) the probability reaches
+    _RISK_LEVELS = ('LOW', 'MEDIUM', 'HIGH')
+    _DECISIONS = ('APPROVE', 'REVIEW', 'BLOCK')
+    
     def __init__(self):
         self.model = None
         self.scaler = StandardScaler()
-        self.feature_columns = [
-            'transaction_amount', 'hour_of_day', 'day_of_week',
-            'user_age_days', 'previous_transactions', 'avg_transaction_amount',
-            'location_risk_score', 'device_risk_score', 'velocity_score',
-            'behavioral_score', 'time_since_last_tx', 'amount_deviation'
-        ]
+        self._tl_models = None
+        self._ensemble = None
+        self._rf_pred = None
+        self._gb_pred = None
+        self.feature_columns = FEATURE_COLUMNS
+        # Pre-drawn samples for the mock risk scores, cycled per call
+        self._beta_tables = {(a, b): np.random.beta(a, b, BETA_TABLE_SIZE) for a, b in BETA_PARAMS}
+        self._beta_idx = defaultdict(int)
+        self._beta_lock = threading.Lock()
+        # tl2cgen.Predictor.predict may be called by only one thread at a time
+        self._predictor_lock = threading.Lock()
+        self._row_builder = _build_scaled_row
+        self._calls = 0  # approximate under concurrency, it only triggers the JIT
+        self._jit_started = False
         self.load_or_train_model()
     
     def generate_synthetic_data(self, n_samples=10000):
         """Generate synthetic fraud detection training data"""
+        X, y = self._synthetic_matrix(n_samples)
+        df = pd.DataFrame(X, columns=self.feature_columns)
+        df['is_fraud'] = y
+        return df
+    
+    def _synthetic_matrix(self, n_samples):
+        """Synthetic training data as an (n_samples, n_features) matrix in FEATURE_COLUMNS order and labels"""
         np.random.seed(42)
         
+        X = np.empty((n_samples, len(self.feature_columns)), dtype=np.float32)
+        
         # Normal transactions (80%)
         normal_samples = int(n_samples * 0.8)
-        normal_data = {
-            'transaction_amount': np.random.lognormal(3, 1, normal_samples),
-            'hour_of_day': np.random.choice(range(6, 23), normal_samples),  # Business hours
-            'day_of_week': np.random.choice(range(1, 6), normal_samples),   # Weekdays
-            'user_age_days': np.random.normal(365, 200, normal_samples),
-            'previous_transactions': np.random.poisson(50, normal_samples),
-            'location_risk_score': np.random.beta(2, 8, normal_samples),    # Low risk
-            'device_risk_score': np.random.beta(2, 8, normal_samples),
-            'velocity_score': np.random.beta(2, 8, normal_samples),
-            'behavioral_score': np.random.beta(8, 2, normal_samples),       # High trust
-            'is_fraud': np.zeros(normal_samples)
-        }
+        normal = slice(None, normal_samples)
+        X[normal, IDX_AMOUNT] = np.random.lognormal(3, 1, normal_samples)
+        X[normal, IDX_HOUR] = np.random.choice(range(6, 23), normal_samples)  # Business hours
+        X[normal, IDX_DOW] = np.random.choice(range(1, 6), normal_samples)   # Weekdays
+        X[normal, IDX_USER_AGE] = np.random.normal(365, 200, normal_samples)
+        X[normal, IDX_PREV_TX] = np.random.poisson(50, normal_samples)
+        X[normal, IDX_LOC] = np.random.beta(2, 8, normal_samples)    # Low risk
+        X[normal, IDX_DEV] = np.random.beta(2, 8, normal_samples)
+        X[normal, IDX_VEL] = np.random.beta(2, 8, normal_samples)
+        X[normal, IDX_BEH] = np.random.beta(8, 2, normal_samples)       # High trust
         
         # Fraudulent transactions (20%)
         fraud_samples = n_samples - normal_samples
-        fraud_data = {
-            'transaction_amount': np.random.lognormal(5, 2, fraud_samples),  # Higher amounts
-            'hour_of_day': np.random.choice(range(24), fraud_samples),       # Any time
-            'day_of_week': np.random.choice(range(7), fraud_samples),        # Any day
-            'user_age_days': np.random.normal(30, 50, fraud_samples),        # New accounts
-            'previous_transactions': np.random.poisson(5, fraud_samples),    # Few transactions
-            'location_risk_score': np.random.beta(8, 2, fraud_samples),      # High risk
-            'device_risk_score': np.random.beta(8, 2, fraud_samples),
-            'velocity_score': np.random.beta(8, 2, fraud_samples),           # High velocity
-            'behavioral_score': np.random.beta(2, 8, fraud_samples),         # Low trust
-            'is_fraud': np.ones(fraud_samples)
-        }
-        
-        # Combine datasets
-        data = {}
-        for key in normal_data.keys():
-            data[key] = np.concatenate([normal_data[key], fraud_data[key]])
+        fraud = slice(normal_samples, None)
+        X[fraud, IDX_AMOUNT] = np.random.lognormal(5, 2, fraud_samples)  # Higher amounts
+        X[fraud, IDX_HOUR] = np.random.choice(range(24), fraud_samples)       # Any time
+        X[fraud, IDX_DOW] = np.random.choice(range(7), fraud_samples)        # Any day
+        X[fraud, IDX_USER_AGE] = np.random.normal(30, 50, fraud_samples)        # New accounts
+        X[fraud, IDX_PREV_TX] = np.random.poisson(5, fraud_samples)    # Few transactions
+        X[fraud, IDX_LOC] = np.random.beta(8, 2, fraud_samples)      # High risk
+        X[fraud, IDX_DEV] = np.random.beta(8, 2, fraud_samples)
+        X[fraud, IDX_VEL] = np.random.beta(8, 2, fraud_samples)           # High velocity
+        X[fraud, IDX_BEH] = np.random.beta(2, 8, fraud_samples)         # Low trust
         
         # Add derived features
-        data['avg_transaction_amount'] = data['transaction_amount'] * np.random.normal(1, 0.3, n_samples)
-        data['time_since_last_tx'] = np.random.exponential(24, n_samples)  # Hours
-        data['amount_deviation'] = np.abs(data['transaction_amount'] - data['avg_transaction_amount'])
+        X[:, IDX_AVG_AMOUNT] = X[:, IDX_AMOUNT] * np.random.normal(1, 0.3, n_samples)
+        X[:, IDX_SINCE_LAST] = np.random.exponential(24, n_samples)  # Hours
+        np.abs(X[:, IDX_AMOUNT] - X[:, IDX_AVG_AMOUNT], out=X[:, IDX_DEVIATION])
         
-        return pd.DataFrame(data)
+        y = np.concatenate([np.zeros(normal_samples), np.ones(fraud_samples)])
+        return X, y
     
     def train_model(self):
         """Train the fraud detection model"""
         logger.info("Generating training data...")
-        df = self.generate_synthetic_data()
-        
-        # Prepare features
-        X = df[self.feature_columns]
-        y = df['is_fraud']
+        # Columns are already positional, no DataFrame projection needed
+        X, y = self._synthetic_matrix(10000)
         
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(
             X, y, test_size=0.2, random_state=42, stratify=y
         )
         
-        # Scale features
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        X_test_scaled = self.scaler.transform(X_test)
+        # Scale features with the same float32 multiply-add used at inference, so the
+        # trees split on exactly the values they will be served
+        self.scaler.fit(X_train)
+        self._fold_scaler(self.scaler.mean_, self.scaler.scale_)
+        X_train_scaled = self._scale(X_train)
+        X_test_scaled = self._scale(X_test)
         
         # Train ensemble model
         logger.info("Training fraud detection model...")
-        rf_model = RandomForestClassifier(n_estimators=100, random_state=42)
-        gb_model = GradientBoostingClassifier(n_estimators=100, random_state=42)
-        
-        rf_model.fit(X_train_scaled, y_train)
-        gb_model.fit(X_train_scaled, y_train)
+        # The members are independent, fit them side by side; tree building releases the GIL
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            rf_future = ex.submit(_fit_rf, X_train_scaled, y_train)
+            gb_future = ex.submit(_fit_gb, X_train_scaled, y_train)
+            rf_model, gb_model = rf_future.result(), gb_future.result()
         
         # Ensemble predictions
         rf_pred = rf_model.predict_proba(X_test_scaled)[:, 1]
@@ -126,57 +321,252 @@ class FraudDetectionEngine:
         }
         
         # Save model
-        joblib.dump(self.model, 'models/fraud_detection_model.pkl')
+        self._save_model()
         logger.info("Model saved successfully")
     
+    def _save_model(self):
+        """Persist the ensemble as Treelite checkpoints when available, else as a pickle"""
+        os.makedirs(os.path.dirname(MODEL_PATH), exist_ok=True)
+        if not _import_treelite():
+            _publish_atomically(MODEL_PATH, lambda tmp_path: joblib.dump(self.model, tmp_path))
+            return
+        
+        self._tl_models = {}
+        for name, path in TREELITE_PATHS.items():
+            self._tl_models[name] = treelite.sklearn.import_model(self.model[name])
+            _publish_atomically(path, self._tl_models[name].serialize)
+        # The scaler goes last: loaders take its presence to mean the checkpoints are complete
+        mean, scale = self._scaler_params
+        _publish_atomically(SCALER_PATH, lambda tmp_path: np.savez(tmp_path, mean=mean, scale=scale))
+        # The checkpoints supersede any pickle left from earlier runs
+        if os.path.exists(MODEL_PATH):
+            os.remove(MODEL_PATH)
+    
     def load_or_train_model(self):
         """Load existing model or train new one"""
+        if self._load_native_ensemble():
+            logger.info("Loaded existing fraud detection model")
+            return
+        
+        _import_treelite()
+        # Treelite reports a missing or corrupt checkpoint as TreeliteError
+        checkpoint_errors = (treelite.TreeliteError,) if treelite is not None else ()
         try:
-            self.model = joblib.load('models/fraud_detection_model.pkl')
-            self.scaler = self.model['scaler']
+            if treelite is not None and os.path.exists(SCALER_PATH):
+                self._tl_models = {
+                    name: treelite.Model.deserialize(path) for name, path in TREELITE_PATHS.items()
+                }
+                with np.load(SCALER_PATH) as params:
+                    self._fold_scaler(params['mean'], params['scale'])
+            else:
+                self.model = joblib.load(MODEL_PATH)
+                self.scaler = self.model['scaler']
+                self._fold_scaler(self.scaler.mean_, self.scaler.scale_)
+                if treelite is not None:
+                    # Migrate a pickle written before Treelite was installed
+                    self._save_model()
             logger.info("Loaded existing fraud detection model")
         except FileNotFoundError:
             logger.info("No existing model found, training new model...")
             self.train_model()
+        except checkpoint_errors as e:
+            logger.warning(f"Could not load Treelite checkpoints, training new model: {e}")
+            self._tl_models = None
+            self.train_model()
+        
+        self._load_compiled_predictors()
+    
+    def _load_native_ensemble(self):
+        """Load up-to-date compiled libraries and scaler through ctypes alone, without Treelite"""
+        members = [(LIB_PATHS[name], path) for name, path in TREELITE_PATHS.items()]
+        if not all(os.path.exists(p) for p in (SCALER_PATH, *(p for pair in members for p in pair))):
+            return False
+        if any(os.path.getmtime(libpath) < os.path.getmtime(path) for libpath, path in members):
+            return False
+        
+        try:
+            ensemble = _NativeEnsemble([libpath for libpath, _ in members])
+            with np.load(SCALER_PATH) as params:
+                self._fold_scaler(params['mean'], params['scale'])
+        except Exception as e:
+            logger.warning(f"Compiled libraries unusable, loading through Treelite: {e}")
+            return False
+        self._ensemble = ensemble
+        return True
+    
+    def _fold_scaler(self, mean, scale):
+        """Fold standardization into one float32 multiply-add: (x - mean) / scale"""
+        self._scaler_params = (mean, scale)
+        self._inv_scale = (1.0 / scale).astype(np.float32)
+        self._neg_mean_over_scale = (-mean * self._inv_scale).astype(np.float32)
     
-    def extract_features(self, transaction_data, user_history=None):
-        """Extract features from transaction data"""
-        features = {}
+    def _scale(self, X):
+        """Standardize a float32 feature matrix into a new array"""
+        X_scaled = np.multiply(X, self._inv_scale)
+        np.add(X_scaled, self._neg_mean_over_scale, out=X_scaled)
+        return X_scaled
+    
+    def _load_compiled_predictors(self):
+        """Compile the Treelite checkpoints to native shared libraries"""
+        if tl2cgen is None or self._tl_models is None:
+            return
+        
+        try:
+            libpaths = []
+            for name, path in TREELITE_PATHS.items():
+                libpath = LIB_PATHS[name]
+                # Recompile only when the checkpoint is newer than the cached library
+                if not os.path.exists(libpath) or os.path.getmtime(libpath) < os.path.getmtime(path):
+                    self._export_lib(self._tl_models[name], libpath)
+                libpaths.append(libpath)
+            try:
+                self._ensemble = _NativeEnsemble(libpaths)
+            except Exception as e:
+                logger.warning(f"Native ensemble entry point unavailable, calling each member: {e}")
+                self._rf_pred, self._gb_pred = [tl2cgen.Predictor(libpath) for libpath in libpaths]
+            logger.info("Loaded compiled tree predictors")
+        except Exception as e:
+            logger.warning(f"Compiled predictors unavailable, using the Treelite interpreter: {e}")
+            self._ensemble = self._rf_pred = self._gb_pred = None
+            return
+        
+        # Every worker maps the same read-only libraries, so the OS shares their pages;
+        # drop this process's own heap copies of the trees
+        self._tl_models = None
+        self.model = None
+    
+    def _export_lib(self, tl_model, libpath):
+        """Compile a model and publish it atomically, so other workers never load a partial library"""
+        def write(tmp_path):
+            # quantize maps inputs onto each feature's sorted split thresholds
+            with _stdout_to_stderr():
+                tl2cgen.export_lib(tl_model, toolchain='gcc', libpath=tmp_path,
+                                   params={'quantize': 1, 'parallel_comp': 4})
+        _publish_atomically(libpath, write)
+    
+    def _predict_proba(self, feature_scaled):
+        """Ensemble fraud probability per row, the mean of the RF and GB members"""
+        # One native call runs both compiled members and averages them
+        if self._ensemble is not None:
+            return self._ensemble.predict(feature_scaled)
+        
+        n_rows = feature_scaled.shape[0]
+        if self._rf_pred is not None:
+            dmat = tl2cgen.DMatrix(feature_scaled)
+            # RF yields both class probabilities, binary GB only the positive one
+            with self._predictor_lock:
+                rf_prob = self._rf_pred.predict(dmat).reshape(n_rows, -1)[:, -1]
+                gb_prob = self._gb_pred.predict(dmat).reshape(n_rows, -1)[:, -1]
+        elif self._tl_models is not None:
+            X = feature_scaled.astype(np.float64, copy=False)
+            rf_prob = treelite.gtil.predict(self._tl_models['rf'], X).reshape(n_rows, -1)[:, -1]
+            gb_prob = treelite.gtil.predict(self._tl_models['gb'], X).reshape(n_rows, -1)[:, -1]
+        else:
+            rf_prob = self.model['rf'].predict_proba(feature_scaled)[:, 1]
+            gb_prob = self.model['gb'].predict_proba(feature_scaled)[:, 1]
+        
+        # GB's sigmoid output can't be folded into RF's averaged leaves, so the
+        # members stay separate models and are combined here
+        fraud_prob = np.add(rf_prob, gb_prob)
+        fraud_prob *= 0.5
+        return fraud_prob
+    
+    def extract_features(self, transaction_data, user_history=None, now=None):
+        """Extract features for one transaction into a (1, n_features) row"""
+        return self.extract_features_batch([transaction_data], [user_history], now)
+    
+    def extract_features_batch(self, txs, histories, now=None, scores=None):
+        """Extract features for many transactions into an (n, n_features) matrix"""
+        if now is None:
+            now = datetime.now()
+        if scores is None:
+            scores = self._risk_scores_batch(txs, histories)
+        X = np.empty((len(txs), len(self.feature_columns)), dtype=np.float32)
         
         # Basic transaction features
-        features['transaction_amount'] = float(transaction_data.get('amount', 0))
-        features['hour_of_day'] = datetime.now().hour
-        features['day_of_week'] = datetime.now().weekday()
+        amounts = np.asarray([float(tx.get('amount', 0)) for tx in txs], dtype=np.float32)
+        X[:, IDX_AMOUNT] = amounts
+        X[:, IDX_HOUR] = now.hour
+        X[:, IDX_DOW] = now.weekday()
         
         # User features
-        if user_history:
-            features['user_age_days'] = user_history.get('account_age_days', 1)
-            features['previous_transactions'] = user_history.get('transaction_count', 0)
-            features['avg_transaction_amount'] = user_history.get('avg_amount', features['transaction_amount'])
-        else:
-            features['user_age_days'] = 1
-            features['previous_transactions'] = 0
-            features['avg_transaction_amount'] = features['transaction_amount']
+        partials = [self._user_features(tx, h) for tx, h in zip(txs, histories)]
+        X[:, IDX_USER_AGE] = [p[0] for p in partials]
+        X[:, IDX_PREV_TX] = [p[1] for p in partials]
+        X[:, IDX_AVG_AMOUNT] = [amount if p[2] is None else p[2] for p, amount in zip(partials, amounts)]
         
-        # Risk scores (normally computed from external services)
-        features['location_risk_score'] = self._compute_location_risk(transaction_data)
-        features['device_risk_score'] = self._compute_device_risk(transaction_data)
-        features['velocity_score'] = self._compute_velocity_risk(transaction_data, user_history)
-        features['behavioral_score'] = self._compute_behavioral_score(transaction_data, user_history)
+        # Risk scores
+        X[:, SCORE_COLUMNS] = scores
         
         # Derived features
-        features['time_since_last_tx'] = user_history.get('hours_since_last_tx', 24) if user_history else 24
-        features['amount_deviation'] = abs(features['transaction_amount'] - features['avg_transaction_amount'])
+        X[:, IDX_SINCE_LAST] = [p[3] for p in partials]
+        X[:, IDX_DEVIATION] = np.abs(amounts - X[:, IDX_AVG_AMOUNT])
         
-        return features
+        return X
+    
+    def _risk_scores_batch(self, txs, histories):
+        """
+        Vectorized _compute_* helpers, as a float64 (n, 4) array in SCORE_COLUMNS order.
+        Kept in float64 so the displayed scores match the single-transaction path.
+        """
+        scores = np.empty((len(txs), len(SCORE_COLUMNS)))
+        countries = [tx.get('location', {}).get('country') for tx in txs]
+        user_agents = np.array([tx.get('deviceInfo', {}).get('userAgent', '') for tx in txs], dtype=str)
+        has_history = np.array([bool(h) for h in histories], dtype=bool)
+        recent_tx_counts = np.array([h.get('recent_tx_count', 0) if h else 0 for h in histories], dtype=np.int64)
+        
+        low_risk_location = np.isin(countries, LOW_RISK_COUNTRIES)
+        scores[:, SCORE_LOC] = self._beta_where(low_risk_location, (2, 8), (5, 5))
+        mobile_android = (np.char.find(user_agents, 'Mobile') >= 0) & (np.char.find(user_agents, 'Android') >= 0)
+        scores[:, SCORE_DEV] = self._beta_where(mobile_android, (2, 8), (4, 6))
+        scores[:, SCORE_VEL] = 0.1
+        scores[has_history, SCORE_VEL] = self._beta_where(recent_tx_counts[has_history] > 10, (8, 2), (2, 8))
+        scores[:, SCORE_BEH] = 0.5
+        scores[has_history, SCORE_BEH] = self._beta_batch(6, 4, int(has_history.sum()))
+        return scores
+    
+    def _user_features(self, transaction_data, user_history):
+        """(age, previous tx, avg amount or None, hours since last tx) from the user's history"""
+        if not user_history:
+            return 1, 0, None, 24
+        return (
+            user_history.get('account_age_days', 1),
+            user_history.get('transaction_count', 0),
+            user_history.get('avg_amount'),
+            user_history.get('hours_since_last_tx', 24)
+        )
+    
+    def _beta(self, a, b):
+        """Next pre-drawn Beta(a, b) sample"""
+        key = (a, b)
+        with self._beta_lock:
+            i = self._beta_idx[key]
+            self._beta_idx[key] = (i + 1) & (BETA_TABLE_SIZE - 1)
+        return float(self._beta_tables[key][i])  # a Python float keeps the result JSON-serializable
+    
+    def _beta_batch(self, a, b, n):
+        """Next n pre-drawn Beta(a, b) samples as an array"""
+        key = (a, b)
+        with self._beta_lock:
+            i = self._beta_idx[key]
+            self._beta_idx[key] = (i + n) & (BETA_TABLE_SIZE - 1)
+        return self._beta_tables[key][(i + np.arange(n)) & (BETA_TABLE_SIZE - 1)]
+    
+    def _beta_where(self, mask, params_true, params_false):
+        """Per-row Beta sample from params_true where mask is set, else from params_false"""
+        out = np.empty(len(mask))
+        n_true = int(mask.sum())
+        out[mask] = self._beta_batch(*params_true, n_true)
+        out[~mask] = self._beta_batch(*params_false, len(mask) - n_true)
+        return out
     
     def _compute_location_risk(self, transaction_data):
         """Compute location-based risk score"""
         # Mock implementation - in reality, use IP geolocation, known fraud locations, etc.
         location = transaction_data.get('location', {})
-        if location.get('country') in ['NG', 'KE', 'GH', 'ZA']:  # African countries - lower risk
-            return np.random.beta(2, 8)  # Low risk
-        return np.random.beta(5, 5)  # Medium risk
+        if location.get('country') in LOW_RISK_COUNTRIES:  # African countries - lower risk
+            return self._beta(2, 8)  # Low risk
+        return self._beta(5, 5)  # Medium risk
     
     def _compute_device_risk(self, transaction_data):
         """Compute device-based risk score"""
@@ -185,8 +575,8 @@ class FraudDetectionEngine:
         
         # Check for suspicious patterns
         if 'Mobile' in user_agent and 'Android' in user_agent:
-            return np.random.beta(2, 8)  # Mobile devices - lower risk
-        return np.random.beta(4, 6)  # Desktop - medium risk
+            return self._beta(2, 8)  # Mobile devices - lower risk
+        return self._beta(4, 6)  # Desktop - medium risk
     
     def _compute_velocity_risk(self, transaction_data, user_history):
         """Compute transaction velocity risk"""
@@ -195,8 +585,8 @@ class FraudDetectionEngine:
         
         recent_tx_count = user_history.get('recent_tx_count', 0)
         if recent_tx_count > 10:  # High velocity
-            return np.random.beta(8, 2)
-        return np.random.beta(2, 8)  # Normal velocity
+            return self._beta(8, 2)
+        return self._beta(2, 8)  # Normal velocity
     
     def _compute_behavioral_score(self, transaction_data, user_history):
         """Compute behavioral trust score"""
@@ -204,60 +594,163 @@ class FraudDetectionEngine:
             return 0.5  # Neutral for new users
         
         # Mock behavioral analysis
-        return np.random.beta(6, 4)  # Generally trustworthy
+        return self._beta(6, 4)  # Generally trustworthy
     
     def predict_fraud(self, transaction_data, user_history=None):
-        """Predict fraud probability for a transaction"""
+        """Predict fraud probability for a transaction; safe to call from several threads"""
         start_time = time.time()
+        now, timestamp = _now()
+        self._calls += 1
+        if self._calls >= JIT_AFTER_CALLS and not self._jit_started:
+            self._jit_started = True
+            threading.Thread(target=self._jit_row_builder, name='fraud-jit', daemon=True).start()
         
         # Extract features
-        features = self.extract_features(transaction_data, user_history)
+        amount = float(transaction_data.get('amount', 0))
+        age, prev_tx, avg_amount, since_last_tx = self._user_features(transaction_data, user_history)
+        if avg_amount is None:
+            avg_amount = amount
+        location = self._compute_location_risk(transaction_data)
+        device = self._compute_device_risk(transaction_data)
+        velocity = self._compute_velocity_risk(transaction_data, user_history)
+        behavioral = self._compute_behavioral_score(transaction_data, user_history)
         
-        # Convert to DataFrame
-        feature_df = pd.DataFrame([features])[self.feature_columns]
+        # Build the scaled row in one pass, into a buffer of this call's own
+        scaled = np.empty((1, len(self.feature_columns)), dtype=np.float32)
+        self._row_builder(amount, float(now.hour), float(now.weekday()), float(age), float(prev_tx),
+                          float(avg_amount), location, device, velocity, behavioral, float(since_last_tx),
+                          scaled[0], self._inv_scale, self._neg_mean_over_scale)
+        
+        # Predict using ensemble
+        fraud_probability = float(self._predict_proba(scaled)[0])
+        
+        processing_time = (time.time() - start_time) * 1000  # ms
+        return self._build_result(fraud_probability, behavioral, location, device, velocity,
+                                  processing_time, timestamp)
+    
+    def _jit_row_builder(self):
+        """Swap in a numba-compiled _build_scaled_row, compiled off the request path"""
+        try:
+            from numba import njit
+        except ImportError:  # JIT is optional, the plain Python version computes the same row
+            return
+        compiled = njit(cache=True)(_build_scaled_row)
+        # Compile for the argument types predict_fraud passes, on a scratch buffer
+        compiled(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0,
+                 np.empty(len(self.feature_columns), dtype=np.float32), self._inv_scale, self._neg_mean_over_scale)
+        self._row_builder = compiled
+        logger.info("JIT-compiled the feature row builder")
+    
+    def predict_fraud_batch(self, txs, histories=None):
+        """Predict fraud probability for a list of transactions in one pass"""
+        if not txs:
+            return []
+        start_time = time.time()
+        now, timestamp = _now()
+        if histories is None:
+            histories = [None] * len(txs)
+        
+        # Extract features
+        scores = self._risk_scores_batch(txs, histories)
+        X = self.extract_features_batch(txs, histories, now, scores)
         
         # Scale features
-        feature_scaled = self.scaler.transform(feature_df)
+        X_scaled = self._scale(X)
         
         # Predict using ensemble
-        rf_prob = self.model['rf'].predict_proba(feature_scaled)[0, 1]
-        gb_prob = self.model['gb'].predict_proba(feature_scaled)[0, 1]
-        fraud_probability = (rf_prob + gb_prob) / 2
-        
-        # Determine risk level and decision
-        if fraud_probability < 0.3:
-            risk_level = 'LOW'
-            decision = 'APPROVE'
-        elif fraud_probability < 0.7:
-            risk_level = 'MEDIUM'
-            decision = 'REVIEW'
-        else:
-            risk_level = 'HIGH'
-            decision = 'BLOCK'
+        fraud_probabilities = self._predict_proba(X_scaled).tolist()
         
         processing_time = (time.time() - start_time) * 1000  # ms
         
+        # Display scores come from the float64 copy, not the float32 model input
+        display = scores.tolist()
+        return [
+            self._build_result(fraud_probability, behavioral, location, device, velocity,
+                               processing_time, timestamp)
+            for fraud_probability, (behavioral, location, device, velocity) in zip(fraud_probabilities, display)
+        ]
+    
+    def _build_result(self, fraud_probability, behavioral, location, device, velocity,
+                      processing_time, timestamp):
+        """Assemble the response for one scored transaction, leaving display rounding to the consumer"""
+        # Determine risk level and decision
+        level = (fraud_probability >= 0.3) + (fraud_probability >= 0.7)
+        
         return {
-            'riskScore': round(fraud_probability, 3),
-            'riskLevel': risk_level,
-            'decision': decision,
-            'confidence': round(max(fraud_probability, 1 - fraud_probability), 3),
+            'riskScore': fraud_probability,
+            'riskLevel': self._RISK_LEVELS[level],
+            'decision': self._DECISIONS[level],
+            'confidence': max(fraud_probability, 1 - fraud_probability),
             'processingTime': f"{processing_time:.0f}ms",
             'features': {
-                'behavioralScore': round(features['behavioral_score'], 3),
-                'locationScore': round(1 - features['location_risk_score'], 3),  # Invert for display
-                'deviceScore': round(1 - features['device_risk_score'], 3),
-                'velocityScore': round(1 - features['velocity_score'], 3)
+                'behavioralScore': behavioral,
+                'locationScore': 1 - location,  # Invert for display
+                'deviceScore': 1 - device,
+                'velocityScore': 1 - velocity
             },
-            'timestamp': datetime.now().isoformat()
+            'timestamp': timestamp
         }
 
+class _BatchRunner:
+    """Collect concurrent requests and score them together on a worker thread"""
+    
+    def __init__(self, engine, max_batch=64, max_delay_ms=5):
+        self.engine = engine
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name='fraud-batcher', daemon=True)
+        self._worker.start()
+    
+    def submit(self, transaction_data, user_history=None):
+        """Queue a transaction and return a Future for its result"""
+        future = Future()
+        self._queue.put((transaction_data, user_history, future))
+        return future
+    
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.time() + self.max_delay
+            # Take whatever is already queued, bounded by batch size and delay budget
+            while len(batch) < self.max_batch and time.time() < deadline:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            txs, histories, futures = zip(*batch)
+            try:
+                results = self.engine.predict_fraud_batch(list(txs), list(histories))
+            except Exception as e:
+                logger.error(f"Batch fraud scoring failed, scoring {len(batch)} requests one by one: {e}")
+                # Keep one bad transaction from failing the requests batched with it
+                for tx, history, future in batch:
+                    try:
+                        future.set_result(self.engine.predict_fraud(tx, history))
+                    except Exception as item_error:
+                        future.set_exception(item_error)
+                continue
+            for future, result in zip(futures, results):
+                future.set_result(result)
+
 # Global instance
 fraud_detector = FraudDetectionEngine()
+batch_runner = _BatchRunner(fraud_detector)
 
 def analyze_transaction(transaction_data, user_history=None):
     """Main function to analyze transaction for fraud"""
-    return fraud_detector.predict_fraud(transaction_data, user_history)
+    future = batch_runner.submit(transaction_data, user_history)
+    return future.result(timeout=RESULT_TIMEOUT)
+
+def dump_result(result, indent=False):
+    """Serialize an analysis result, via orjson when it is installed"""
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(result, option=option).decode()
+    return json.dumps(result, indent=2 if indent else None)
 
 if __name__ == "__main__":
     # Test the fraud detection system
@@ -279,4 +772,4 @@ if __name__ == "__main__":
     
     result = analyze_transaction(test_transaction, test_history)
     print("Fraud Detection Result:")
-    print(json.dumps(result, indent=2))
+    print(dump_result(result, indent=True))
@@ -169,11 +169,11 @@ import json
 sys.path.append('${path.dirname(this.aiScriptPath)}')
 
 try:
-    from fraud_detection import analyze_transaction
+    from fraud_detection import analyze_transaction, dump_result
     
     input_data = json.loads('${JSON.stringify(inputData).replace(/'/g, "\\'")}')
     result = analyze_transaction(input_data['transaction'], input_data['user_history'])
-    print(json.dumps(result))
+    print(dump_result(result))
     
 except Exception as e:
     error_result = {
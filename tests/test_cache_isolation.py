@@ -0,0 +1,79 @@
+"""
+Mutating a cached lookup's result must not change what later lookups return
+"""
+import asyncio
+import os
+import sys
+import unittest
+from unittest import mock
+
+import httpx
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Domain_Lookup
+
+URL = "https://testnet.mirrornode.hedera.com/api/v1/accounts/0.0.1"
+BODY = b'{"balance": {"balance": 1, "tokens": []}}'
+
+
+def _sync_get(url, params=None, headers=None):
+    response = requests.Response()
+    response.url = url
+    if headers and headers.get('If-None-Match') == '"v1"':
+        response.status_code = 304
+        response._content = b''
+    else:
+        response.status_code = 200
+        response._content = BODY
+        response.headers['ETag'] = '"v1"'
+    return response
+
+
+def _async_handler(request):
+    if request.headers.get('If-None-Match') == '"v1"':
+        return httpx.Response(304)
+    return httpx.Response(200, content=BODY, headers={'ETag': '"v1"'})
+
+
+class CacheIsolationTests(unittest.TestCase):
+    def setUp(self):
+        for cache in (Domain_Lookup.MIRROR_CACHE, Domain_Lookup.NEGATIVE_CACHE,
+                      Domain_Lookup.VALIDATOR_CACHE):
+            cache.clear()
+        patch = mock.patch.object(Domain_Lookup.MIRROR_SESSION, 'get', side_effect=_sync_get)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def _get(self):
+        return Domain_Lookup.cached_get(Domain_Lookup.MIRROR_SESSION, Domain_Lookup.MIRROR_CACHE, URL)
+
+    def test_sync_hits_and_revalidations_are_independent(self):
+        self._get()['balance']['tokens'].append('mutated')
+        self.assertEqual(self._get()['balance']['tokens'], [])
+
+        # An expired entry is revalidated by a 304 and served from the validator cache
+        Domain_Lookup.MIRROR_CACHE.clear()
+        self._get()['balance']['balance'] = 0
+        self.assertEqual(self._get()['balance']['balance'], 1)
+
+    def test_async_hits_and_revalidations_are_independent(self):
+        async def run():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(_async_handler)) as client:
+                async def get():
+                    return await Domain_Lookup.cached_get_async(client, Domain_Lookup.MIRROR_CACHE, URL)
+
+                (await get())['balance']['tokens'].append('mutated')
+                first = await get()
+                Domain_Lookup.MIRROR_CACHE.clear()
+                (await get())['balance']['balance'] = 0
+                return first, await get()
+
+        first, revalidated = asyncio.run(run())
+        self.assertEqual(first['balance']['tokens'], [])
+        self.assertEqual(revalidated['balance']['balance'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+Cached 404s must surface as the calling client's own exception type
+"""
+import os
+import sys
+import unittest
+from unittest import mock
+
+import httpx
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Domain_Lookup
+import Proxy_Hedera
+
+MIRROR_BASE = "https://testnet.mirrornode.hedera.com/api/v1"
+
+
+def _requests_response(url, status_code, body=b'{}'):
+    response = requests.Response()
+    response.status_code = status_code
+    response.url = url
+    response._content = body
+    return response
+
+
+def _sync_get(url, params=None, headers=None):
+    if url.endswith('0.0.404'):
+        return _requests_response(url, 404)
+    return _requests_response(url, 200, b'{"balance": {"balance": 1, "tokens": []}}')
+
+
+def _async_handler(request):
+    if str(request.url.path).endswith('0.0.404'):
+        return httpx.Response(404, json={})
+    return httpx.Response(200, json={'balance': {'balance': 1, 'tokens': []}})
+
+
+def _mock_client():
+    return httpx.AsyncClient(transport=httpx.MockTransport(_async_handler))
+
+
+class NegativeCacheTests(unittest.TestCase):
+    def setUp(self):
+        for cache in (Domain_Lookup.MIRROR_CACHE, Domain_Lookup.NEGATIVE_CACHE,
+                      Domain_Lookup.VALIDATOR_CACHE):
+            cache.clear()
+        patches = [
+            mock.patch.object(Domain_Lookup.MIRROR_SESSION, 'get', side_effect=_sync_get),
+            mock.patch.object(Proxy_Hedera, 'fanout_client', _mock_client),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_sync_404_then_async_batch(self):
+        self.assertIsNone(Proxy_Hedera.hedera_proxy_query('0.0.404'))
+        self.assertTrue(Domain_Lookup.NEGATIVE_CACHE)
+
+        result = Proxy_Hedera.batch_hedera_query(['0.0.1', '0.0.404'])
+        self.assertEqual([r['status'] for r in result['results']], ['success', 'error'])
+
+    def test_async_404_then_sync(self):
+        Proxy_Hedera.batch_hedera_query(['0.0.404'])
+        url = f"{MIRROR_BASE}/accounts/0.0.404"
+        with self.assertRaises(requests.exceptions.HTTPError) as raised:
+            Domain_Lookup.cached_get(Domain_Lookup.MIRROR_SESSION, Domain_Lookup.MIRROR_CACHE,
+                                     url, {'transactions': 'false'})
+        self.assertEqual(raised.exception.response.status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
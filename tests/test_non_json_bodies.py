@@ -0,0 +1,43 @@
+"""
+A 200 with a non-JSON body must fail only its own lookup on the httpx paths
+"""
+import os
+import sys
+import unittest
+from unittest import mock
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Domain_Lookup
+import Proxy_Hedera
+
+
+def _async_handler(request):
+    if str(request.url.path).endswith('0.0.500'):
+        return httpx.Response(200, text='<html>Bad Gateway</html>')
+    return httpx.Response(200, json={'balance': {'balance': 1, 'tokens': []}})
+
+
+def _mock_client():
+    return httpx.AsyncClient(transport=httpx.MockTransport(_async_handler))
+
+
+class NonJsonBodyTests(unittest.TestCase):
+    def setUp(self):
+        for cache in (Domain_Lookup.MIRROR_CACHE, Domain_Lookup.NEGATIVE_CACHE,
+                      Domain_Lookup.VALIDATOR_CACHE):
+            cache.clear()
+        patch = mock.patch.object(Proxy_Hedera, 'fanout_client', _mock_client)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_batch_query_isolates_html_body(self):
+        result = Proxy_Hedera.batch_hedera_query(['0.0.1', '0.0.500'])
+        self.assertEqual([r['status'] for r in result['results']], ['success', 'error'])
+        self.assertEqual(result['successful_queries'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()